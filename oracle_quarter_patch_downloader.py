@@ -15,8 +15,6 @@ Based on getMOSPatch v2 from Maris Elsins
 
 Requires:
     - requests
-    - beautifulsoup4
-    - html5lib
 
 Version: $Id$
 """
@@ -314,7 +312,7 @@ def main(argv=None):
         logging.fatal("Invalid config file")
         return 1
 
-    patch_dler = OraclePatchDownloader(
+    with OraclePatchDownloader(
         username=get_ora_user(
             cli_args.oracle_username, config_json["username"]
         ),
@@ -323,68 +321,73 @@ def main(argv=None):
         ),
         wanted_platforms=config_json["platforms"],
         target_dir=config_json["target_dir"],
-    )
-
-    if cli_args.refresh_catalog:
-        logging.debug("Cleaning up the em_catalog* files")
-        patch_dler.cleanup_downloader_resources()
-        logging.debug("Finished")
-
-    print("Initializing Downloader.")
-    try:
-        total_downloaded_bytes = patch_dler.initialize_downloader(
-            cli_args.patch_list_file
-        )
-    except (RequestException, OracleSupportError) as excep:
-        error_str = (
-            f"Not able to connect to updates.oracle.com\n"
-            f"Error message: {str(excep)}"
-        )
-        logging.fatal(error_str)
-        return 1
-
-    if cli_args.list_platforms_only:
-        print_platforms(patch_dler)
-        return 0
+    ) as patch_dler:
+        if cli_args.refresh_catalog:
+            logging.debug("Cleaning up the em_catalog* files")
+            patch_dler.cleanup_downloader_resources()
+            logging.debug("Finished")
+
+        print("Initializing Downloader.")
+        try:
+            total_downloaded_bytes = patch_dler.initialize_downloader(
+                cli_args.patch_list_file
+            )
+        except (RequestException, OracleSupportError) as excep:
+            error_str = (
+                f"Not able to connect to updates.oracle.com\n"
+                f"Error message: {str(excep)}"
+            )
+            logging.fatal(error_str)
+            return 1
+
+        if cli_args.list_platforms_only:
+            print_platforms(patch_dler)
+            return 0
+
+        if cli_args.patch_list_file:
+            logging.debug("File %s passed", cli_args.patch_list_file)
+            total_downloaded_bytes += handle_file(
+                cli_args.patch_list_file,
+                patch_dler,
+                cli_args.dry_run_mode,
+            )
 
-    if cli_args.patch_list_file:
-        logging.debug("File %s passed", cli_args.patch_list_file)
-        total_downloaded_bytes += handle_file(
-            cli_args.patch_list_file,
-            patch_dler,
-            cli_args.dry_run_mode,
-        )
+        else:
+            total_downloaded_bytes += patch_dler.download_oracle_patch(
+                patch_number=_AHF_PATCH_NUMBER,
+                patch_type=OraclePatchType.AHF,
+                progress_function=print_progress_function,
+                dry_run_mode=cli_args.dry_run_mode,
+            )
 
-    else:
-        total_downloaded_bytes += patch_dler.download_oracle_patch(
-            patch_number=_AHF_PATCH_NUMBER,
-            patch_type=OraclePatchType.AHF,
-            progress_function=print_progress_function,
-            dry_run_mode=cli_args.dry_run_mode,
-        )
+            total_downloaded_bytes += patch_dler.download_oracle_patch(
+                patch_number=_OPATCH_PATCH_NUMBER,
+                patch_type=OraclePatchType.OPATCH,
+                progress_function=print_progress_function,
+                dry_run_mode=cli_args.dry_run_mode,
+            )
 
-        total_downloaded_bytes += patch_dler.download_oracle_patch(
-            patch_number=_OPATCH_PATCH_NUMBER,
-            patch_type=OraclePatchType.OPATCH,
-            progress_function=print_progress_function,
-            dry_run_mode=cli_args.dry_run_mode,
-        )
+            total_downloaded_bytes += (
+                patch_dler.download_oracle_quarter_patches(
+                    patch_type=OraclePatchType.QUARTER,
+                    ignored_releases=config_json["ignored_releases"],
+                    ignored_description_words=config_json[
+                        "ignored_description_words"
+                    ],
+                    progress_function=print_progress_function,
+                    dry_run_mode=cli_args.dry_run_mode,
+                )
+            )
 
-        total_downloaded_bytes += patch_dler.download_oracle_quarter_patches(
-            patch_type=OraclePatchType.QUARTER,
-            ignored_releases=config_json["ignored_releases"],
-            ignored_description_words=config_json["ignored_description_words"],
-            progress_function=print_progress_function,
-            dry_run_mode=cli_args.dry_run_mode,
+        # Looks like original idea was to indicate file size rather than
+        # download amount.
+        ## em_catalog.zip and em_catalog directory occupy around 300 MB
+        # total_downloaded_bytes += 300 * 1024 * 1024
+        print(
+            f"Total downloaded ~ {total_downloaded_bytes/1024/1024:,.2f} MB"
         )
 
-    # Looks like original idea was to indicate file size rather than
-    # download amount.
-    ## em_catalog.zip and em_catalog directory occupy around 300 MB
-    # total_downloaded_bytes += 300 * 1024 * 1024
-    print(f"Total downloaded ~ {total_downloaded_bytes/1024/1024:,.2f} MB")
-
-    return 0
+        return 0
 
 
 if __name__ == "__main__":
@@ -4,8 +4,6 @@ Author: Lucas Pimentel Lellis
 
 Requires:
     - requests
-    - beautifulsoup4
-    - html5lib
 
 Based on getMOSPatch v2 from Maris Elsins
 (https://github.com/MarisElsins/getMOSPatch).
@@ -15,34 +13,328 @@ Version: $Id$
 """
 
 import collections
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 import datetime
+import functools
 from enum import Enum
 import hashlib
+import json
 import logging
+import mmap
 import os
 import pathlib
 import re
 import shutil
+import sys
+import threading
 import time
-import xml.etree
+from typing import NamedTuple
+import xml.etree.ElementTree
+import xml.parsers.expat
 import zipfile
 from http import HTTPStatus
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Mandatory as it's the only way to escape Oracle's JavaScript check
 _HEADERS = {"User-Agent": "Wget/1.20.3"}
 
-# Mandatory as sometimes Oracle's HTML is broken
-_DEFAULT_HTML_PARSER = "html5lib"
-
-_CHUNK_SIZE = 2097152  # 2 MB
+_CHUNK_SIZE = 1048576  # 1 MB
 
 _REQUEST_TIMEOUT = 30  # seconds
 
+_CHECKSUM_LOOKUP_WORKERS = 8
+
+_MAX_PARALLEL_DOWNLOADS = 4
+
+# Files bigger than this are downloaded in byte ranges over parallel
+# connections, when Oracle accepts range requests for them.
+_SEGMENTED_DOWNLOAD_MIN_SIZE = 67108864  # 64 MB
+_DOWNLOAD_SEGMENTS = 4
+
+_PARTIAL_FILE_SUFFIX = ".part"
+
+# Records the verified checksum of a downloaded file with its size and mtime
+_CHECKSUM_FILE_SUFFIX = ".sha256"
+
+_POOL_CONNECTIONS = 4
+_POOL_MAXSIZE = 32
+
+# Retries transient gateway errors from updates.oracle.com. The last
+# response is returned once the retries are exhausted, as without retries.
+_HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[502, 503, 504],
+    raise_on_status=False,
+)
+
+# patch_recommendations.xml files bigger than this are parsed by a pool of
+# processes
+_PARALLEL_PARSE_MIN_SIZE = 67108864  # 64 MB
+
 _DESC_FILE_NAME = "description.txt"
 
+_ARU_CHECKSUMS_FILE_NAME = ".aru_sha256.json"
+
+_DB_RELEASE_COMPONENT_NAMES = frozenset(
+    {"Oracle Database", "RAC One Node", "Oracle Clusterware"}
+)
+
+# Sections of patch_recommendations.xml listing the recommended patches
+_RECOMMENDATION_SECTIONS = frozenset(
+    {"standalone_recommendations", "components_recommendations"}
+)
+
+_RE_URL_PREFIX = re.compile(
+    r"https://[^.]+\.oracle\.com/([A-Za-z0-9-_]+/){0,}"
+)
+_RE_URL_QUERY_STRING = re.compile(r"[?].+$")
+_RE_ARU = re.compile(r"[?]aru=([0-9]+)")
+_RE_SHA256 = re.compile(r"\b[A-Fa-f0-9]{64}\b")
+_RE_DIR_NAME_INVALID_CHARS = re.compile(r"[^a-zA-Z0-9_.-]+")
+_RE_DIR_NAME_EDGE_UNDERSCORE = re.compile(r"^_|_$")
+_RE_PATCHES_START_TAG = re.compile(rb"<patches(?:\s[^>]*)?>")
+_RE_XML_DECLARATION = re.compile(rb"(?:\xef\xbb\xbf)?<\?xml\s[^>]*\?>")
+
+
+def _parse_patch_recommendations(xml_parts, add_patch, add_recommendation):
+    """Parses the content of a patch_recommendations.xml file with expat.
+
+    No element objects are built. The state of the patch or recommended
+    release being parsed is kept in dicts, and text is only gathered for the
+    tags that are stored. Each section of the file has its own handlers,
+    which the parser switches to when entering it, so the handlers only test
+    the tags that section can hold. This is a module function so it can also
+    run in worker processes.
+
+    Args:
+        xml_parts (iterable): bytes-like objects, such as a memory-mapped
+            file, fed to the parser in order. Together they hold the XML
+            document, or a part of it wrapped in its own root element.
+        add_patch (function): called with a dict of the fields parsed from
+            each "patch" element of the "patches" section.
+        add_recommendation (function): called for each platform of a release
+            in a recommendations section, with the following parameters:
+                - (str): cid of the release
+                - (str): platform code
+                - (list): uids of the recommended patches
+    """
+    parser = xml.parsers.expat.ParserCreate()
+    parser.buffer_text = True
+
+    # Tags of the elements enclosing the parser position
+    tag_stack = []
+    # Depth of the sections being parsed
+    patches_depth = 0
+    recommendations_depth = 0
+    # Fields of the patch, patch file and recommended release being
+    # parsed, None outside of them.
+    patch = None
+    patch_file = None
+    release = None
+    # Text of the tag being parsed, None if it is not stored
+    text_parts = None
+    # Depth inside a fixed_bugs tag, whose content is skipped
+    skip_depth = 0
+
+    def set_element_handlers(start_handler, end_handler):
+        parser.StartElementHandler = start_handler
+        parser.EndElementHandler = end_handler
+
+    def start_element(tag, attrs):
+        nonlocal patches_depth, recommendations_depth, patch, release
+
+        tag_stack.append(tag)
+        if tag == "patch" and patches_depth > 0:
+            patch = {
+                "depth": len(tag_stack),
+                "uid": attrs.get("uid"),
+                "access": None,
+                "files": [],
+            }
+            set_element_handlers(patch_start_element, patch_end_element)
+        elif tag == "release" and recommendations_depth > 0:
+            release = {"depth": len(tag_stack), "cid": attrs.get("cid")}
+            set_element_handlers(release_start_element, release_end_element)
+        elif tag == "patches":
+            patches_depth += 1
+        elif tag in _RECOMMENDATION_SECTIONS:
+            recommendations_depth += 1
+
+    def end_element(tag):
+        nonlocal patches_depth, recommendations_depth
+
+        if tag == "patches":
+            patches_depth -= 1
+        elif tag in _RECOMMENDATION_SECTIONS:
+            recommendations_depth -= 1
+
+        tag_stack.pop()
+
+    def patch_start_element(tag, attrs):
+        nonlocal patch_file, text_parts, skip_depth
+
+        if tag == "fixed_bugs":
+            skip_depth = 1
+            set_element_handlers(skip_start_element, skip_end_element)
+            return
+
+        tag_stack.append(tag)
+        level = len(tag_stack) - patch["depth"]
+        if level == 1:
+            if tag == "platform":
+                patch["platform_code"] = attrs.get("id")
+            elif tag == "release":
+                patch["release_name"] = attrs.get("name")
+            elif tag in ("name", "access"):
+                text_parts = []
+        elif level == 2:
+            if tag == "abstract" and tag_stack[-2] == "bug":
+                text_parts = []
+            elif tag == "file" and tag_stack[-2] == "files":
+                patch_file = {"sha256sum": None}
+        elif level == 3 and patch_file is not None:
+            if tag == "download_url":
+                patch_file["host"] = attrs.get("host")
+                text_parts = []
+            elif tag == "digest":
+                patch_file["digest_type"] = attrs.get("type")
+                text_parts = []
+            elif tag in ("name", "size"):
+                text_parts = []
+
+        if text_parts is not None:
+            parser.CharacterDataHandler = text_parts.append
+
+    def patch_end_element(tag):
+        nonlocal patch, patch_file, text_parts
+
+        text = None
+        if text_parts is not None:
+            text = "".join(text_parts) or None
+            text_parts = None
+            parser.CharacterDataHandler = None
+
+        level = len(tag_stack) - patch["depth"]
+        if level == 0:
+            add_patch(patch)
+            patch = None
+            set_element_handlers(start_element, end_element)
+        elif level == 1:
+            if tag in ("name", "access"):
+                patch[tag] = text
+        elif level == 2:
+            if tag == "abstract" and tag_stack[-2] == "bug":
+                patch["description"] = text
+            elif tag == "file" and patch_file is not None:
+                patch["files"].append(patch_file)
+                patch_file = None
+        elif level == 3 and patch_file is not None:
+            if tag == "download_url":
+                patch_file["download_url"] = patch_file["host"] + text
+            elif tag == "digest":
+                if patch_file["digest_type"] == "SHA-256":
+                    patch_file["sha256sum"] = text
+            elif tag == "name":
+                patch_file["name"] = text
+            elif tag == "size":
+                patch_file["size"] = int(text)
+
+        tag_stack.pop()
+
+    def skip_start_element(tag, attrs):
+        nonlocal skip_depth
+
+        skip_depth += 1
+
+    def skip_end_element(tag):
+        nonlocal skip_depth
+
+        skip_depth -= 1
+        if not skip_depth:
+            set_element_handlers(patch_start_element, patch_end_element)
+
+    def release_start_element(tag, attrs):
+        tag_stack.append(tag)
+        level = len(tag_stack) - release["depth"]
+        if level == 1:
+            release["platform_code"] = attrs.get("id")
+            release["patch_uids"] = []
+        elif level == 2:
+            release["patch_uids"].append(attrs.get("uid"))
+
+    def release_end_element(tag):
+        nonlocal release
+
+        level = len(tag_stack) - release["depth"]
+        if level == 0:
+            release = None
+            set_element_handlers(start_element, end_element)
+        elif level == 1:
+            add_recommendation(
+                release["cid"],
+                release["platform_code"],
+                release["patch_uids"],
+            )
+
+        tag_stack.pop()
+
+    set_element_handlers(start_element, end_element)
+    # Each part is handed whole to the parser, which scans it in place
+    # instead of reading the file through small buffers.
+    for xml_part in xml_parts:
+        parser.Parse(xml_part, False)
+    parser.Parse(b"", True)
+
+
+def _parse_patch_recommendations_range(
+    file_path, start, end, platform_ids
+) -> list:
+    """Parses the patches found between two offsets of the "patches"
+    section of a patch_recommendations.xml file.
+
+    The XML declaration of the file is parsed first, so the range is
+    decoded with the encoding of the whole file.
+
+    Args:
+        file_path (pathlib.Path): path of the patch_recommendations.xml file
+        start (int): offset of the first patch
+        end (int): offset just after the end of the last patch
+        platform_ids (frozenset): platforms whose patches are kept
+
+    Returns:
+        list: dicts of the fields parsed from each "patch" element
+    """
+    with open(file_path, "rb") as recommendations_file, mmap.mmap(
+        recommendations_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as recommendations_xml:
+        xml_declaration_match = _RE_XML_DECLARATION.match(recommendations_xml)
+        xml_declaration = (
+            xml_declaration_match.group() if xml_declaration_match else b""
+        )
+        patches_xml = recommendations_xml[start:end]
+
+    patches = []
+
+    def add_patch(patch):
+        if patch.get("platform_code") in platform_ids:
+            patches.append(patch)
+
+    _parse_patch_recommendations(
+        (xml_declaration, b"<patches>", patches_xml, b"</patches>"),
+        add_patch,
+        lambda *recommendation: None,
+    )
+
+    return patches
+
 
 class OraclePatchDownloader:
     """Class that enables downloading Oracle patches
@@ -50,7 +342,14 @@ class OraclePatchDownloader:
     Author: Lucas Pimentel Lellis
     """
 
-    def __init__(self, username, password, wanted_platforms, target_dir="."):
+    def __init__(
+        self,
+        username,
+        password,
+        wanted_platforms,
+        target_dir=".",
+        max_parallel_downloads=_MAX_PARALLEL_DOWNLOADS,
+    ):
         """Creates an instance of OraclePatchDownloader
 
         Args:
@@ -60,17 +359,99 @@ class OraclePatchDownloader:
                 Oracle, that the user wants patches to be downloaded.
             target_dir (str): The target directory where patches are downloaded
                 Defaults to ".".
+            max_parallel_downloads (int): Maximum number of files downloaded
+                at the same time. Defaults to 4.
         """
         self.__cookie_jar = None
+        self.__session = requests.Session()
+        self.__session.headers.update(_HEADERS)
+        self.__session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=_POOL_CONNECTIONS,
+                pool_maxsize=max(_POOL_MAXSIZE, max_parallel_downloads),
+                max_retries=_HTTP_RETRY,
+            ),
+        )
         self.__all_platforms = None
         self.__download_links = None
         self.__db_release_components = None
-        self.__all_db_patches = None
+        self.__db_patch_indexes = None
+        self.__db_patches = None
+        self.__db_patch_files = None
         self.__recommended_db_patches = None
+        self.__recommended_uid_bits = None
+        self.__recommended_uids = None
         self.username = username
         self.password = password
         self.target_dir = target_dir
-        self.wanted_platforms = wanted_platforms
+        self.__target_path = pathlib.Path(target_dir)
+        self.__catalog_file_path = self.__target_path / "em_catalog.zip"
+        self.__catalog_dir_path = self.__target_path / "em_catalog"
+        self.__aru_platforms_file_path = (
+            self.__catalog_dir_path / "aru_platforms.xml"
+        )
+        self.__components_file_path = (
+            self.__catalog_dir_path / "components.xml"
+        )
+        self.__recommendations_file_path = (
+            self.__catalog_dir_path / "patch_recommendations.xml"
+        )
+        self.__aru_checksums_file_path = (
+            self.__target_path / _ARU_CHECKSUMS_FILE_NAME
+        )
+        # format - {aru: sha256sum,}
+        self.__aru_checksums = self.__load_aru_checksums()
+        self.__aru_checksums_changed = False
+        self.wanted_platforms = frozenset(wanted_platforms)
+        self.max_parallel_downloads = max_parallel_downloads
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the HTTP session and its pooled connections, and saves the
+        checksums obtained from Oracle for the next runs."""
+        self.__session.close()
+        if self.__aru_checksums_changed:
+            self.__save_aru_checksums()
+
+    def __load_aru_checksums(self) -> dict:
+        """Loads the checksums obtained from Oracle by previous runs.
+
+        Returns:
+            dict: SHA-256 checksums keyed by ARU, empty if there are none.
+        """
+        try:
+            with open(
+                self.__aru_checksums_file_path, encoding="utf-8"
+            ) as checksums_file:
+                aru_checksums = json.load(checksums_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+        if not isinstance(aru_checksums, dict):
+            return {}
+
+        return aru_checksums
+
+    def __save_aru_checksums(self):
+        """Saves the checksums obtained from Oracle for the next runs."""
+        tmp_file_path = self.__aru_checksums_file_path.with_name(
+            _ARU_CHECKSUMS_FILE_NAME + ".tmp"
+        )
+        try:
+            with open(tmp_file_path, "wt", encoding="utf-8") as checksums_file:
+                json.dump(self.__aru_checksums, checksums_file)
+            os.replace(tmp_file_path, self.__aru_checksums_file_path)
+        except OSError as excep:
+            logging.warning("Not able to save the ARU checksums: %s", excep)
+            return
+
+        self.__aru_checksums_changed = False
 
     def initialize_downloader(self, download_from_file):
         """Initializes the downloader.
@@ -97,13 +478,13 @@ class OraclePatchDownloader:
             else:
                 raise OracleSupportError("Status code 401")
 
-        pathlib.Path(self.target_dir).mkdir(parents=True, exist_ok=True)
+        self.__target_path.mkdir(parents=True, exist_ok=True)
 
         total_downloaded_bytes = 0
         # Catalogue is needed to build the platform code list.
         # See if we have one from within the last 24 hours.
         try:
-            catfile = self.target_dir + os.path.sep + "em_catalog.zip"
+            catfile = self.__catalog_file_path
             logging.debug("Expected catalog location: %s", catfile)
             catfilestat = os.stat(catfile)
             if catfilestat.st_mtime < time.time() - 60 * 60 * 24:
@@ -135,19 +516,7 @@ class OraclePatchDownloader:
         Returns:
             dict: Dictionary of platforms
         """
-        aru_platforms_doc = xml.etree.ElementTree.parse(
-            self.target_dir
-            + os.path.sep
-            + "em_catalog"
-            + os.path.sep
-            + "aru_platforms.xml"
-        )
-        aru_platforms_doc_root = aru_platforms_doc.getroot()
-
-        platforms = {
-            tag.get("id"): tag.text.strip()
-            for tag in aru_platforms_doc_root.iterfind("./platform")
-        }
+        platforms = dict(self.__iter_aru_platforms())
 
         return platforms
 
@@ -182,38 +551,50 @@ class OraclePatchDownloader:
             logging.fatal("Please call initialize_downloader() first")
             return 1
 
-        if self.__download_links:
-            self.__download_links.clear()
-
         self.__build_list_download_links(patch_number)
 
-        dest_dir = self.target_dir + os.path.sep + patch_type.value
+        dest_dir = self.__target_path / patch_type.value
 
-        pathlib.Path(dest_dir).mkdir(parents=True, exist_ok=True)
+        dest_dir.mkdir(parents=True, exist_ok=True)
 
         total_downloaded_bytes = 0
-        for dl_link in self.__download_links:
-            try:
-                oracle_checksum = self.__obtain_sha256_checksum_oracle(dl_link)
-                total_downloaded_bytes += self.__download_link(
-                    dl_link,
-                    oracle_checksum,
-                    dest_dir,
-                    progress_function,
-                    dry_run_mode,
+        # Checksums missing from the search results are looked up in the
+        # background, so their round trips overlap each other and the
+        # downloads. Dry runs don't verify them.
+        with ThreadPoolExecutor(
+            max_workers=_CHECKSUM_LOOKUP_WORKERS
+        ) as executor:
+            checksum_futures = [
+                None
+                if dry_run_mode or checksum
+                else executor.submit(
+                    self.__obtain_sha256_checksum_oracle, dl_link
                 )
-            except ChecksumMismatch:
-                local_filename = (
-                    dest_dir
-                    + os.path.sep
-                    + self.__extract_file_name_from_url(dl_link)
-                )
-                error_str = (
-                    f"{local_filename}"
-                    " checksum does not match Oracle's checksum. "
-                    "Please remove it manually and download it again."
-                )
-                logging.error(error_str)
+                for dl_link, checksum in self.__download_links
+            ]
+            for (dl_link, checksum), checksum_future in zip(
+                self.__download_links, checksum_futures
+            ):
+                if checksum_future:
+                    checksum = checksum_future.result()
+                try:
+                    total_downloaded_bytes += self.__download_link(
+                        dl_link,
+                        checksum,
+                        dest_dir,
+                        progress_function,
+                        dry_run_mode,
+                    )
+                except ChecksumMismatch:
+                    local_filename = (
+                        dest_dir / self.__extract_file_name_from_url(dl_link)
+                    )
+                    error_str = (
+                        f"{local_filename}"
+                        " checksum does not match Oracle's checksum. "
+                        "Please remove it manually and download it again."
+                    )
+                    logging.error(error_str)
 
         return total_downloaded_bytes
 
@@ -245,151 +626,310 @@ class OraclePatchDownloader:
         Returns:
             int: Total downloaded in bytes
         """
-        dest_dir = self.target_dir + os.path.sep + patch_type.value
-        desc_file_path_counter = collections.Counter()
+        dest_dir = self.__target_path / patch_type.value
+        ignored_releases_regexes = self.__compile_expressions(ignored_releases)
+        ignored_description_words_regexes = self.__compile_expressions(
+            ignored_description_words
+        )
         total_downloaded_bytes = 0
+        db_release_components = self.__db_release_components
+        # format - [(platform_id, version, bitset),]
+        wanted_releases = []
+        recommended_patch_bits = 0
         for (
-            reco_patch_comp_id,
-            reco_patch_plat,
-        ) in self.__recommended_db_patches:
+            (reco_patch_comp_id, reco_patch_plat),
+            reco_patch_bits,
+        ) in self.__recommended_db_patches.items():
+            version = db_release_components[reco_patch_comp_id]["version"]
+            if self.__is_expression_ignored(ignored_releases_regexes, version):
+                continue
+            wanted_releases.append((reco_patch_plat, version, reco_patch_bits))
+            recommended_patch_bits |= reco_patch_bits
+
+        wanted_patch_bits = self.__filter_recommended_db_patches(
+            recommended_patch_bits,
+            ignored_description_words_regexes,
+            dry_run_mode,
+        )
+        # format - {local_file_path: OraclePatchFile,}
+        download_tasks = {}
+        # format - {desc_file_path: {desc_line_1, ..., desc_line_n},}
+        desc_files_lines = {}
+        patch_descriptions = self.__db_patches["description"]
+        patch_files = self.__db_patches["files"]
+        file_urls = self.__db_patch_files["download_url"]
+        file_names = self.__db_patch_files["name"]
+        file_sizes = self.__db_patch_files["size"]
+        patch_indexes = self.__db_patch_indexes
+        recommended_uids = self.__recommended_uids
+        all_platforms = self.__all_platforms
+        for reco_patch_plat, version, reco_patch_bits in wanted_releases:
             normalized_plat_dir_name = self.__normalize_directory_name(
-                self.__all_platforms[reco_patch_plat]
+                all_platforms[reco_patch_plat]
             )
-            version = self.__db_release_components[reco_patch_comp_id][
-                "version"
+            patch_dest_path = dest_dir / version / normalized_plat_dir_name
+            desc_file_path = patch_dest_path / _DESC_FILE_NAME
+            desc_lines = desc_files_lines.setdefault(desc_file_path, set())
+
+            for patch_bit in self.__iter_bits(
+                reco_patch_bits & wanted_patch_bits
+            ):
+                patch_index = patch_indexes[recommended_uids[patch_bit]]
+                description = patch_descriptions[patch_index]
+                for file_index in patch_files[patch_index]:
+                    desc_lines.add(
+                        f"{file_names[file_index]} - {description}\n"
+                    )
+                    # The same file, or another one with the same name,
+                    # may be recommended for more than one component sharing
+                    # the same destination directory.
+                    file_path = (
+                        patch_dest_path
+                        / self.__extract_file_name_from_url(
+                            file_urls[file_index]
+                        )
+                    )
+                    if file_path not in download_tasks:
+                        download_tasks[file_path] = self.__get_db_patch_file(
+                            file_index
+                        )
+                        total_downloaded_bytes += file_sizes[file_index]
+
+        for desc_file_path, desc_lines in desc_files_lines.items():
+            desc_file_path.parent.mkdir(parents=True, exist_ok=True)
+            self.__merge_desc_file(desc_file_path, desc_lines)
+
+        self.__download_files(download_tasks, progress_function, dry_run_mode)
+
+        return total_downloaded_bytes
+
+    def __filter_recommended_db_patches(
+        self,
+        recommended_patch_bits,
+        ignored_description_words_regexes,
+        dry_run_mode,
+    ) -> int:
+        """Checks every recommended patch once, no matter how many components
+        and platforms recommend it.
+
+        Args:
+            recommended_patch_bits (int): bitset of the patches recommended
+            for the releases that are not ignored.
+            ignored_description_words_regexes (list): Compiled regexes of
+            words to be matched for descriptions of patches that must not be
+            downloaded.
+            dry_run_mode: Logs the description of each wanted patch.
+
+        Returns:
+            int: bitset of the recommended patches that must be downloaded.
+        """
+        patch_bits = list(self.__iter_bits(recommended_patch_bits))
+        patch_uids = [self.__recommended_uids[bit] for bit in patch_bits]
+        patch_indexes = [self.__db_patch_indexes[uid] for uid in patch_uids]
+        all_descriptions = self.__db_patches["description"]
+        all_access_levels = self.__db_patches["access_level"]
+        patch_descriptions = [all_descriptions[i] for i in patch_indexes]
+        patch_protected = [
+            all_access_levels[i].upper() == "PASSWORD PROTECTED"
+            for i in patch_indexes
+        ]
+
+        if not ignored_description_words_regexes:
+            patch_ignored = [False] * len(patch_uids)
+        else:
+            patch_ignored = [
+                self.__is_expression_ignored(
+                    ignored_description_words_regexes, description
+                )
+                for description in patch_descriptions
             ]
-            if self.__is_expression_ignored(ignored_releases, version):
+
+        wanted_patch_bits = 0
+        for index, patch_bit in enumerate(patch_bits):
+            if patch_ignored[index]:
                 continue
 
-            patch_dest_path = (
-                dest_dir
-                + os.path.sep
-                + version
-                + os.path.sep
-                + normalized_plat_dir_name
-            )
-            pathlib.Path(patch_dest_path).mkdir(parents=True, exist_ok=True)
-            desc_file_path = patch_dest_path + os.path.sep + _DESC_FILE_NAME
+            if patch_protected[index]:
+                patch = self.__get_db_patch(patch_indexes[index])
+                error_str = (
+                    f'Patch "{patch.number} - {patch.description}"'
+                    " is password-protected. Download it manually"
+                    " if you need it."
+                )
+                logging.error(error_str)
+                continue
+
+            if dry_run_mode:
+                logging.info(patch_descriptions[index])
+
+            wanted_patch_bits |= 1 << patch_bit
 
-            desc_file_open_mode = "at"
+        return wanted_patch_bits
 
+    @staticmethod
+    def __iter_bits(bitset):
+        """Yields the positions of the bits set in a bitset.
+
+        Args:
+            bitset (int): the bitset
+
+        Yields:
+            int: position of each bit set, from the lowest one
+        """
+        while bitset:
+            lowest_bit = bitset & -bitset
+            yield lowest_bit.bit_length() - 1
+            bitset ^= lowest_bit
+
+    def __download_files(
+        self, download_tasks, progress_function, dry_run_mode
+    ):
+        """Downloads patch files concurrently, limited to
+        max_parallel_downloads files at the same time.
+
+        Args:
+            download_tasks (dict): A dictionary of OraclePatchFile keyed by
+                the local path of the file.
+            progress_function (function): a function that will be called with
+            the following parameters:
+                - (str): file name
+                - (int): file size in bytes
+                - (int): total downloaded in bytes
+            dry_run_mode: Returns the amount downloaded in bytes without
+            actually downloading the files.
+        """
+        locked_progress_function = None
+        if progress_function:
+            progress_lock = threading.Lock()
+
+            def locked_progress_function(*args):
+                with progress_lock:
+                    progress_function(*args)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_parallel_downloads
+        ) as executor:
+            futures = {
+                executor.submit(
+                    self.__download_link,
+                    file.download_url,
+                    file.sha256sum,
+                    file_path.parent,
+                    locked_progress_function,
+                    dry_run_mode,
+                ): file
+                for file_path, file in download_tasks.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except ChecksumMismatch:
+                    error_str = (
+                        f"{futures[future].name}"
+                        " checksum does not match Oracle's checksum. "
+                        "Please remove it manually and download it "
+                        "again."
+                    )
+                    logging.error(error_str)
+                except (requests.RequestException, OSError) as excep:
+                    error_str = (
+                        f"{futures[future].name} could not be downloaded: "
+                        f"{excep}"
+                    )
+                    logging.error(error_str)
+
+    @staticmethod
+    def __merge_desc_file(desc_file_path, desc_lines):
+        """Merges description lines into a description.txt file, which is
+        kept sorted and without duplicate lines.
+
+        The file is rewritten through a temporary file, so an interrupted run
+        never leaves it truncated.
+
+        Args:
+            desc_file_path (pathlib.Path): path of the description.txt file
+            desc_lines (set): lines to be merged, ending with a newline
+        """
+        try:
             with open(
-                desc_file_path, encoding="utf-8", mode=desc_file_open_mode
-            ) as desc_file:
-                for patch_uid in self.__recommended_db_patches[
-                    (reco_patch_comp_id, reco_patch_plat)
-                ]:
-                    if self.__is_expression_ignored(
-                        ignored_description_words,
-                        self.__all_db_patches[patch_uid].description,
-                    ):
-                        continue
-                    patch = self.__all_db_patches[patch_uid]
-                    if patch.access_level.upper() == "PASSWORD PROTECTED":
-                        error_str = (
-                            f'Patch "{patch.number} - {patch.description}"'
-                            " is password-protected. Download it manually"
-                            " if you need it."
-                        )
-                        logging.error(error_str)
-                        continue
+                desc_file_path, "rt", encoding="utf-8"
+            ) as desc_file_handler:
+                desc_lines = desc_lines.union(desc_file_handler)
+        except FileNotFoundError:
+            pass
 
-                    if dry_run_mode:
-                        logging.info(patch.description)
+        desc_tmp_file = desc_file_path.with_name(desc_file_path.name + ".tmp")
+        with open(desc_tmp_file, "wt", encoding="utf-8") as desc_file_handler:
+            desc_file_handler.write("".join(sorted(desc_lines)))
+        os.replace(desc_tmp_file, desc_file_path)
 
-                    for file in patch.files:
-                        print(
-                            f"{file.name} - {patch.description}",
-                            file=desc_file,
-                        )
-                        total_downloaded_bytes += int(file.size)
-                        try:
-                            self.__download_link(
-                                file.download_url,
-                                file.sha256sum,
-                                patch_dest_path,
-                                progress_function,
-                                dry_run_mode,
-                            )
-                        except ChecksumMismatch:
-                            error_str = (
-                                f"{file.name}"
-                                " checksum does not match Oracle's checksum. "
-                                "Please remove it manually and download it "
-                                "again."
-                            )
-                            logging.error(error_str)
-
-                desc_file_path_counter[desc_file_path] += 1
-
-        self.__remove_duplicate_lines_desc_files()
+    @staticmethod
+    def __compile_expressions(expressions):
+        """Compiles a list of regexes once, instead of on every search.
 
-        return total_downloaded_bytes
+        Each regex is compiled on its own, so its inline flags and group
+        numbers mean the same as when it is searched alone.
 
-    def __remove_duplicate_lines_desc_files(self):
-        """Removes duplicate lines from description.txt files."""
-        desc_file_list = pathlib.Path(self.target_dir).glob(
-            f"**/{_DESC_FILE_NAME}"
-        )
-        for desc_file in desc_file_list:
-            with open(desc_file, "r+t", encoding="utf-8") as desc_file_handler:
-                desc_lines_set = sorted(set(desc_file_handler.readlines()))
-                desc_file_handler.seek(os.SEEK_SET)
-                desc_file_handler.truncate(0)
-                desc_file_handler.writelines(desc_lines_set)
+        Args:
+            expressions (list): List of regexes.
+
+        Returns:
+            list: the compiled regexes.
+        """
+        if not expressions:
+            return []
+
+        return [re.compile(expression) for expression in expressions]
 
     @staticmethod
-    def __is_expression_ignored(ignored_expressions, expression) -> bool:
+    def __is_expression_ignored(
+        ignored_expressions_regexes, expression
+    ) -> bool:
         """Checks if a word is on the list of ignored.
 
         Args:
-            ignored_expressions (list): List of ignored expressions.
+            ignored_expressions_regexes (list): Compiled ignored
+                expressions, as returned by __compile_expressions.
             expression (str): expression to be tested.
 
         Returns:
             bool: True if the expression is ignored.
         """
-        for ignored_release_regex in ignored_expressions:
-            match = re.search(ignored_release_regex, expression)
-            if match is not None:
-                return True
-
-        return False
+        return any(
+            ignored_expression_regex.search(expression) is not None
+            for ignored_expression_regex in ignored_expressions_regexes
+        )
 
     def cleanup_downloader_resources(self):
         """Cleans up the em_catalog files."""
-        catalog_file_path = self.target_dir + os.path.sep + "em_catalog.zip"
-        catalog_directory_path = self.target_dir + os.path.sep + "em_catalog"
-
-        shutil.rmtree(catalog_directory_path, ignore_errors=True)
-        catalog_file = pathlib.Path(catalog_file_path)
+        shutil.rmtree(self.__catalog_dir_path, ignore_errors=True)
         try:
-            catalog_file.unlink()
+            self.__catalog_file_path.unlink()
         except FileNotFoundError:
             pass
 
     def __logon_oracle_support(
         self,
     ):
-        """Fills a cookie jar with logon information to Oracle Support
+        """Fills the session cookie jar with logon information to Oracle
+        Support
 
-        Oracle Support login does not work with using requests.Session. It also
-        does not work with allow_redirects=True, so we have to treat each
-        redirect manually while also updating the cookie_jar.
+        Oracle Support login does not work with allow_redirects=True, so we
+        have to treat each redirect manually. The session keeps the cookies
+        received on each hop.
 
         Setting the headers to Wget/X.X.X is also mandatory, as it's the only
         way to authenticate without JavaScript support.
 
         """
 
-        login_response = requests.get(
+        login_response = self.__session.get(
             "https://updates.oracle.com/Orion/Services/download",
             auth=(self.username, self.password),
             allow_redirects=False,
-            headers=_HEADERS,
             timeout=_REQUEST_TIMEOUT,
         )
-        self.__cookie_jar = login_response.cookies
+        self.__cookie_jar = self.__session.cookies
 
         status_code = login_response.status_code
         while True:
@@ -407,19 +947,15 @@ class OraclePatchDownloader:
                     new_url = "https://updates.oracle.com" + location
                 else:
                     new_url = location
-                login_response = requests.get(
+                login_response = self.__session.get(
                     new_url,
                     auth=(self.username, self.password),
                     allow_redirects=False,
-                    headers=_HEADERS,
-                    cookies=self.__cookie_jar,
                     timeout=_REQUEST_TIMEOUT,
                 )
-                self.__cookie_jar.update(login_response.cookies)
                 status_code = login_response.status_code
 
             elif status_code == HTTPStatus.OK:
-                self.__cookie_jar.update(login_response.cookies)
                 break
             else:
                 logging.fatal(f"Unexpected HTTP status code from login: {status_code}")
@@ -436,24 +972,26 @@ class OraclePatchDownloader:
         Returns:
             dict: A dictionary of platform codes and names.
         """
-        platform_codes_file_path = (
-            self.target_dir
-            + os.path.sep
-            + "em_catalog"
-            + os.path.sep
-            + "aru_platforms.xml"
-        )
-        aru_platforms_doc = xml.etree.ElementTree.parse(
-            platform_codes_file_path
-        )
-        aru_platforms_doc_root = aru_platforms_doc.getroot()
-
         self.__all_platforms = {
-            tag.get("id"): tag.text.strip()
-            for tag in aru_platforms_doc_root.iterfind("./platform")
-            if tag.text.strip() in self.wanted_platforms
+            platform_id: platform_name
+            for platform_id, platform_name in self.__iter_aru_platforms()
+            if platform_name in self.wanted_platforms
         }
 
+    def __iter_aru_platforms(self):
+        """Streams the platforms from the em_catalog/aru_platforms.xml file,
+        releasing each element once it has been read.
+
+        Yields:
+            tuple: platform code and platform name
+        """
+        for _, elem in xml.etree.ElementTree.iterparse(
+            self.__aru_platforms_file_path, events=("end",)
+        ):
+            if elem.tag == "platform":
+                yield elem.get("id"), elem.text.strip()
+                elem.clear()
+
     def get_patch_info(self, patch_number, platform, version = ''):
         """Get a list of files listing a patch number and (numeric) platform
         code.
@@ -467,62 +1005,36 @@ class OraclePatchDownloader:
             of the file to download.
         """
         downloads = []
-        patch_meta = {}
         logging.debug(
             "Getting patch information for %s on %s.", patch_number, platform
         )
-        root = xml.etree.ElementTree.fromstring(requests.get(
-            "https://updates.oracle.com/Orion/Services/search",
-            params={"bug": patch_number},
-            headers=_HEADERS,
-            cookies=self.__cookie_jar,
-            timeout=_REQUEST_TIMEOUT,
-        ).text)
-
-        # If required we can keep the XML in a file as follows:
-        # infofile = open(f"{patch_number}.xml","w")
-        # infofile.write(resp.text)
-        # infofile.close()
 
-        # We want all the files which match our architecture. This
-        # document lists all files. So we need to search the XML
-
-        # for patchinfo.findall(
-        #   f"//patch[platform[@id={platform}]]/files/file/download_url/text()"
-        # )
-        for patch in root.iter("patch"):
-            patch_meta['platform'] = patch.find("platform").attrib["id"]
-            patch_meta['version'] = patch.find("release").attrib["name"]
+        # We want all the files which match our architecture. The search
+        # lists the files of all platforms.
+        for patch_platform, patch_version, patch_files in (
+            self.__search_patch_files(patch_number)
+        ):
             logging.debug(
                 "Patch platform: %s, Wanted: %s, Version: %s, Wanted %s",
-                patch_meta['platform'],
+                patch_platform,
                 platform,
-                patch_meta['version'],
+                patch_version,
                 version,
             )
-            if ( patch_meta['platform'] == platform
-                    and patch_meta['version'].startswith(version) ):
+            if ( patch_platform == platform
+                    and patch_version is not None
+                    and patch_version.startswith(version) ):
                 # We want these files
                 logging.debug("Platform and version match")
-                files = patch.find("files")
-                for patch_file in files.findall("file"):
-                    patch_download_host = patch_file.find(
-                        "download_url"
-                    ).attrib["host"]
-                    patch_download_url = patch_file.find("download_url").text
-                    patch_file_name = patch_file.find("name").text
-                    logging.debug("URL: %s", patch_download_url)
-                    for patch_digest in patch_file.findall("digest"):
-                        if patch_digest.attrib["type"] == "SHA-256":
-                            patch_sha = patch_digest.text
+                for patch_url, patch_sha, patch_file_name in patch_files:
                     downloads.append(
                         {
-                            "url": patch_download_host + patch_download_url,
+                            "url": patch_url,
                             "sha": patch_sha,
                             "name": patch_file_name,
                         }
                     )
-                    logging.debug("URL: %s", patch_download_url)
+                    logging.debug("URL: %s", patch_url)
                     logging.debug("SHA: %s", patch_sha)
                     logging.debug("NAME: %s", patch_file_name)
         return downloads
@@ -572,33 +1084,75 @@ class OraclePatchDownloader:
         return bytes_downloaded
 
     def __build_list_download_links(self, patch_number):
-        """Returns a list containing download links for a given patch number
-        and a list of platforms.
+        """Builds the list of download links of a patch number for the
+        downloader platforms.
 
-        Returns:
-            list: A list of links to be downloaded
-        """
+        All platforms are listed by a single search, together with the
+        SHA-256 checksum of each file.
 
+        Args:
+            patch_number (str): an Oracle patch number
+        """
+        # format - [(download_url, sha256sum),]
         self.__download_links = []
+        for patch_platform, _, patch_files in self.__search_patch_files(
+            patch_number
+        ):
+            if patch_platform not in self.__all_platforms:
+                continue
 
-        for platform in self.__all_platforms:
-            resp = requests.get(
-                "https://updates.oracle.com/Orion/SimpleSearch/process_form",
-                params={
-                    "search_type": "patch",
-                    "patch_number": patch_number,
-                    "plat_lang": platform + "P",
-                },
-                headers=_HEADERS,
-                cookies=self.__cookie_jar,
+            for download_url, sha256sum, _ in patch_files:
+                self.__download_links.append((download_url, sha256sum))
+
+    def __search_patch_files(self, patch_number):
+        """Searches Oracle Support for the files of a patch number, on all
+        platforms and releases at once.
+
+        Args:
+            patch_number (str): an Oracle patch number
+
+        Returns:
+            list: a (platform_id, release_name, files) tuple for each patch
+            found, files being a list of (download_url, sha256sum, name)
+            tuples. platform_id and release_name are None when missing, and
+            sha256sum is empty when the search has no SHA-256 digest for the
+            file.
+        """
+        root = xml.etree.ElementTree.fromstring(
+            self.__session.get(
+                "https://updates.oracle.com/Orion/Services/search",
+                params={"bug": patch_number},
                 timeout=_REQUEST_TIMEOUT,
+            ).text
+        )
+
+        patches = []
+        for patch in root.iter("patch"):
+            platform_tag = patch.find("platform")
+            release_tag = patch.find("release")
+            patch_files = []
+            for patch_file in patch.iterfind("./files/file"):
+                download_url_tag = patch_file.find("download_url")
+                digest_tag = patch_file.find("./digest[@type='SHA-256']")
+                sha256sum = ""
+                if digest_tag is not None and digest_tag.text:
+                    sha256sum = digest_tag.text.strip().upper()
+                patch_files.append(
+                    (
+                        download_url_tag.get("host") + download_url_tag.text,
+                        sha256sum,
+                        patch_file.findtext("name"),
+                    )
+                )
+            patches.append(
+                (
+                    None if platform_tag is None else platform_tag.get("id"),
+                    None if release_tag is None else release_tag.get("name"),
+                    patch_files,
+                )
             )
-            resp_soup = BeautifulSoup(resp.text, _DEFAULT_HTML_PARSER)
-            links = resp_soup.find_all(
-                "a", attrs={"href": re.compile(r"\.zip")}
-            )
-            for link in links:
-                self.__download_links.append(link["href"])
+
+        return patches
 
     def __download_link(
         self,
@@ -614,8 +1168,6 @@ class OraclePatchDownloader:
             url (str): the link to be downloaded
             oracle_file_checksum: SHA-256 checksum obtained from the download
                 source
-            cookie_jar (requests.RequestsCookieJar): a cookie jar containing
-                Oracle Support connection information
             target_dir (str): The target directory where patches are downloaded
             progress_function (function): a function that will be called with
                 the following parameters:
@@ -629,11 +1181,21 @@ class OraclePatchDownloader:
             int: Total downloaded in bytes
         """
         file_name = self.__extract_file_name_from_url(url)
+        file_path = os.path.join(target_dir, file_name)
+
+        recorded_checksum = ""
+        if not dry_run_mode:
+            recorded_checksum = self.__read_checksum_file(file_path)
 
-        resp_dl = requests.get(
+        if oracle_file_checksum and recorded_checksum == oracle_file_checksum:
+            logging.debug("%s already downloaded and verified", file_name)
+            file_size = os.stat(file_path).st_size
+            if progress_function:
+                progress_function(file_name, file_size, file_size)
+            return file_size
+
+        resp_dl = self.__session.get(
             url,
-            cookies=self.__cookie_jar,
-            headers=_HEADERS,
             stream=True,
             timeout=_REQUEST_TIMEOUT,
         )
@@ -648,23 +1210,64 @@ class OraclePatchDownloader:
             logging.info(file_name)
             return file_size
 
-        if self.__check_file_exists(target_dir, file_name, file_size):
-            progress_function(file_name, file_size, file_size)
+        partial_file_size = self.__get_partial_file_size(file_path)
+
+        if self.__check_file_exists(file_path, file_size):
+            resp_dl.close()
+            if progress_function:
+                progress_function(file_name, file_size, file_size)
+            downloaded_file_checksum = (
+                recorded_checksum
+                or self.__calculate_file_checksum(file_path)
+            )
+        elif 0 < partial_file_size < file_size:
+            downloaded_file_checksum = self.__download_stream(
+                url,
+                resp_dl,
+                file_path,
+                file_name,
+                file_size,
+                progress_function,
+                resume_from=partial_file_size,
+                calculate_checksum=bool(oracle_file_checksum),
+            )
+        elif self.__accepts_byte_ranges(resp_dl, file_size):
+            resp_dl.close()
+            try:
+                self.__download_segments(
+                    url, file_path, file_name, file_size, progress_function
+                )
+                downloaded_file_checksum = self.__calculate_file_checksum(
+                    file_path
+                )
+            except SegmentedDownloadError as excep:
+                logging.debug(
+                    "%s. Downloading %s in a single stream.", excep, file_name
+                )
+                resp_dl = self.__session.get(
+                    url,
+                    stream=True,
+                    timeout=_REQUEST_TIMEOUT,
+                )
+                downloaded_file_checksum = self.__download_stream(
+                    url,
+                    resp_dl,
+                    file_path,
+                    file_name,
+                    file_size,
+                    progress_function,
+                    calculate_checksum=bool(oracle_file_checksum),
+                )
         else:
-            total_dl = 0
-            with open(
-                target_dir + os.path.sep + file_name,
-                "wb",
-            ) as dl_file:
-                for chunk in resp_dl.iter_content(_CHUNK_SIZE):
-                    total_dl += len(chunk)
-                    dl_file.write(chunk)
-                    if file_size and progress_function:
-                        progress_function(file_name, file_size, total_dl)
-
-        downloaded_file_checksum = self.__calculate_file_checksum(
-            target_dir, file_name
-        )
+            downloaded_file_checksum = self.__download_stream(
+                url,
+                resp_dl,
+                file_path,
+                file_name,
+                file_size,
+                progress_function,
+                calculate_checksum=bool(oracle_file_checksum),
+            )
 
         if (
             oracle_file_checksum
@@ -672,8 +1275,342 @@ class OraclePatchDownloader:
         ):
             raise ChecksumMismatch
 
+        if oracle_file_checksum and not recorded_checksum:
+            self.__write_checksum_file(file_path, downloaded_file_checksum)
+
         return file_size
 
+    @staticmethod
+    def __read_checksum_file(file_path) -> str:
+        """Reads the checksum recorded for a downloaded file.
+
+        Args:
+            file_path (str): path of the downloaded file
+
+        Returns:
+            str: the recorded SHA-256 checksum, or an empty string if there is
+            none or the file changed since it was recorded.
+        """
+        try:
+            with open(
+                file_path + _CHECKSUM_FILE_SUFFIX, encoding="utf-8"
+            ) as checksum_file:
+                checksum, file_size, file_mtime_ns = (
+                    checksum_file.read().split()
+                )
+            file_stat = os.stat(file_path)
+        except (FileNotFoundError, ValueError):
+            return ""
+
+        if (
+            file_stat.st_size == int(file_size)
+            and file_stat.st_mtime_ns == int(file_mtime_ns)
+        ):
+            return checksum
+
+        return ""
+
+    @staticmethod
+    def __write_checksum_file(file_path, checksum):
+        """Records the checksum of a downloaded file next to it.
+
+        Args:
+            file_path (str): path of the downloaded file
+            checksum (str): SHA-256 checksum of the file
+        """
+        file_stat = os.stat(file_path)
+        with open(
+            file_path + _CHECKSUM_FILE_SUFFIX, "wt", encoding="utf-8"
+        ) as checksum_file:
+            checksum_file.write(
+                f"{checksum} {file_stat.st_size} {file_stat.st_mtime_ns}\n"
+            )
+
+    def __download_stream(
+        self,
+        url,
+        resp_dl,
+        file_path,
+        file_name,
+        file_size,
+        progress_function,
+        resume_from=0,
+        calculate_checksum=True,
+    ):
+        """Writes the body of a download response to file_path.
+
+        The file is written under a temporary name until it is complete and
+        its SHA-256 checksum is calculated while the chunks are written. When
+        resume_from is given, the rest of that partial file is requested with
+        a range request and appended to it. If Oracle does not honour the
+        range, the download restarts from the beginning. When there is no
+        progress to report nor checksum to calculate, the body is copied to
+        the file without going through the chunks in Python.
+
+        Args:
+            url (str): the link to be downloaded
+            resp_dl (requests.Response): a streamed download response
+            file_path (str): Path where the file is downloaded to.
+            file_name (str): Name of the file being downloaded.
+            file_size (int): Size in bytes of the original file.
+            progress_function (function): a function that will be called with
+                the following parameters:
+                    - (str): file name
+                    - (int): file size in bytes
+                    - (int): total downloaded in bytes
+            resume_from (int): Size in bytes of the partial file already
+                downloaded. Defaults to 0.
+            calculate_checksum (bool): Whether the checksum of the file is
+                needed. Defaults to True.
+
+        Returns:
+            str: SHA-256 checksum of the downloaded file, or an empty string
+            if calculate_checksum is False.
+        """
+        partial_file_path = file_path + _PARTIAL_FILE_SUFFIX
+
+        total_dl = resume_from
+        if total_dl:
+            resp_dl.close()
+            resp_dl = self.__session.get(
+                url,
+                headers={"Range": f"bytes={total_dl}-"},
+                stream=True,
+                timeout=_REQUEST_TIMEOUT,
+            )
+            expected_range = f"bytes {total_dl}-{file_size - 1}/"
+            if resp_dl.status_code != HTTPStatus.PARTIAL_CONTENT or (
+                not resp_dl.headers.get("content-range", "").startswith(
+                    expected_range
+                )
+            ):
+                logging.debug(
+                    "Not able to resume %s. Restarting the download.",
+                    file_name,
+                )
+                # A 200 response already carries the whole file
+                if resp_dl.status_code != HTTPStatus.OK:
+                    resp_dl.close()
+                    resp_dl = self.__session.get(
+                        url,
+                        stream=True,
+                        timeout=_REQUEST_TIMEOUT,
+                    )
+                total_dl = 0
+            else:
+                logging.debug(
+                    "Resuming %s from byte %d.", file_name, total_dl
+                )
+
+        if not (calculate_checksum or progress_function):
+            with open(
+                partial_file_path, "ab" if total_dl else "wb"
+            ) as dl_file:
+                resp_dl.raw.decode_content = True
+                shutil.copyfileobj(resp_dl.raw, dl_file, _CHUNK_SIZE)
+            os.replace(partial_file_path, file_path)
+            return ""
+
+        if total_dl and calculate_checksum:
+            file_hash = self.__hash_file(partial_file_path)
+        else:
+            file_hash = hashlib.sha256()
+
+        with open(partial_file_path, "ab" if total_dl else "wb") as dl_file:
+            for chunk in resp_dl.iter_content(_CHUNK_SIZE):
+                total_dl += len(chunk)
+                dl_file.write(chunk)
+                if calculate_checksum:
+                    file_hash.update(chunk)
+                if file_size and progress_function:
+                    progress_function(file_name, file_size, total_dl)
+
+        os.replace(partial_file_path, file_path)
+
+        if not calculate_checksum:
+            return ""
+
+        return file_hash.hexdigest().upper()
+
+    @staticmethod
+    def __get_partial_file_size(file_path) -> int:
+        """Returns the size of a partially downloaded file.
+
+        Args:
+            file_path (str): Path where the file is downloaded to.
+
+        Returns:
+            int: Size in bytes of the partial file, 0 if there is none.
+        """
+        try:
+            return os.stat(file_path + _PARTIAL_FILE_SUFFIX).st_size
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def __accepts_byte_ranges(resp_dl, file_size) -> bool:
+        """Checks if a file is worth downloading in byte ranges.
+
+        Args:
+            resp_dl (requests.Response): a streamed download response
+            file_size (int): Size in bytes of the original file.
+
+        Returns:
+            bool: True if the file is big enough and the server announces
+            support for range requests.
+        """
+        return (
+            hasattr(os, "pwrite")
+            and resp_dl.status_code == HTTPStatus.OK
+            and file_size > _SEGMENTED_DOWNLOAD_MIN_SIZE
+            and resp_dl.headers.get("accept-ranges", "").lower() == "bytes"
+        )
+
+    def __download_segments(
+        self, url, file_path, file_name, file_size, progress_function
+    ):
+        """Downloads a file to file_path in _DOWNLOAD_SEGMENTS byte
+        ranges requested in parallel.
+
+        The file is preallocated, so it is written under a temporary name
+        until all segments are complete. Otherwise a partial download would
+        already have the final size.
+
+        Args:
+            url (str): the link to be downloaded
+            file_path (str): Path where the file is downloaded to.
+            file_name (str): Name of the file being downloaded.
+            file_size (int): Size in bytes of the original file.
+            progress_function (function): a function that will be called with
+                the following parameters:
+                    - (str): file name
+                    - (int): file size in bytes
+                    - (int): total downloaded in bytes
+
+        Raises:
+            SegmentedDownloadError: when a byte range could not be downloaded
+        """
+        partial_file_path = file_path + _PARTIAL_FILE_SUFFIX
+        segment_size = -(-file_size // _DOWNLOAD_SEGMENTS)
+        segments = [
+            (first_byte, min(first_byte + segment_size, file_size) - 1)
+            for first_byte in range(0, file_size, segment_size)
+        ]
+
+        progress_lock = threading.Lock()
+        total_dl = 0
+
+        def report_progress(chunk_size):
+            nonlocal total_dl
+            with progress_lock:
+                total_dl += chunk_size
+                if progress_function:
+                    progress_function(file_name, file_size, total_dl)
+
+        # Set when a segment fails, so the others stop instead of
+        # downloading bytes that are thrown away.
+        cancel_event = threading.Event()
+        segment_responses = []
+
+        dl_fd = os.open(
+            partial_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644
+        )
+        try:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(dl_fd, 0, file_size)
+            with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                futures = [
+                    executor.submit(
+                        self.__download_segment,
+                        url,
+                        dl_fd,
+                        first_byte,
+                        last_byte,
+                        report_progress,
+                        cancel_event,
+                        segment_responses,
+                    )
+                    for first_byte, last_byte in segments
+                ]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    cancel_event.set()
+                    for future in futures:
+                        future.cancel()
+                    for resp_segment in segment_responses:
+                        resp_segment.close()
+                    raise
+        except BaseException:
+            # Without preallocation the file has holes wherever a segment
+            # was not written, so it must never be resumed.
+            os.remove(partial_file_path)
+            raise
+        finally:
+            os.close(dl_fd)
+
+        os.replace(partial_file_path, file_path)
+
+    def __download_segment(
+        self,
+        url,
+        dl_fd,
+        first_byte,
+        last_byte,
+        report_progress,
+        cancel_event,
+        segment_responses,
+    ):
+        """Downloads a byte range of a file and writes it at its offset.
+
+        Args:
+            url (str): the link to be downloaded
+            dl_fd (int): file descriptor of the file being downloaded
+            first_byte (int): offset of the first byte of the range
+            last_byte (int): offset of the last byte of the range
+            report_progress (function): a function that will be called with
+                the size of each chunk written.
+            cancel_event (threading.Event): set when another segment of the
+                file failed.
+            segment_responses (list): the response of the range is added to
+                it, so it can be closed when another segment fails.
+
+        Raises:
+            SegmentedDownloadError: when the range is not honoured, is
+            incomplete or was cancelled
+        """
+        if cancel_event.is_set():
+            raise SegmentedDownloadError(
+                f"Range {first_byte}-{last_byte} cancelled"
+            )
+        resp_segment = self.__session.get(
+            url,
+            headers={"Range": f"bytes={first_byte}-{last_byte}"},
+            stream=True,
+            timeout=_REQUEST_TIMEOUT,
+        )
+        segment_responses.append(resp_segment)
+        with resp_segment:
+            if resp_segment.status_code != HTTPStatus.PARTIAL_CONTENT:
+                raise SegmentedDownloadError(
+                    f"Range request returned {resp_segment.status_code}"
+                )
+            offset = first_byte
+            for chunk in resp_segment.iter_content(_CHUNK_SIZE):
+                if cancel_event.is_set():
+                    raise SegmentedDownloadError(
+                        f"Range {first_byte}-{last_byte} cancelled"
+                    )
+                os.pwrite(dl_fd, chunk, offset)
+                offset += len(chunk)
+                report_progress(len(chunk))
+
+        if offset != last_byte + 1:
+            raise SegmentedDownloadError(
+                f"Range {first_byte}-{last_byte} incomplete at byte {offset}"
+            )
+
     @staticmethod
     def __extract_file_name_from_url(url) -> str:
         """Extracts the file name from url.
@@ -685,23 +1622,20 @@ class OraclePatchDownloader:
             str: the file name as defined on the URL
         """
 
-        file_name = re.sub(
-            r"https://[^.]+\.oracle\.com/([A-Za-z0-9-_]+/){0,}", "", url
-        )
-        file_name = re.sub("[?].+$", "", file_name)
+        file_name = _RE_URL_PREFIX.sub("", url)
+        file_name = _RE_URL_QUERY_STRING.sub("", file_name)
 
         return file_name
 
     @staticmethod
-    def __check_file_exists(target_dir, file_name, file_size) -> bool:
+    def __check_file_exists(file_path, file_size) -> bool:
         """Check if a file exists and has the correct size.
 
         Args:
-            target_dir (str): The target directory where patches are downloaded
-            file_name (str): Name of the file being downloaded.
+            file_path (str): Path where the file is downloaded to.
             file_size (_type_): Size in bytes of the original file.
         """
-        target_file = pathlib.Path(target_dir + os.path.sep + file_name)
+        target_file = pathlib.Path(file_path)
         if target_file.is_file():
             if target_file.stat().st_size == file_size:
                 return True
@@ -720,48 +1654,67 @@ class OraclePatchDownloader:
             str: SHA-256 for the file on Oracle Support
         """
         checksum = ""
-        aru_matches = re.search("[?]aru=[0-9]+", url)
+        aru_matches = _RE_ARU.search(url)
         if aru_matches:
-            aru = aru_matches.group(0).split("=")[1]
-            resp_chksum = requests.get(
+            aru = aru_matches.group(1)
+            if aru in self.__aru_checksums:
+                return self.__aru_checksums[aru]
+
+            resp_chksum = self.__session.get(
                 "https://updates.oracle.com/Orion/ViewDigest/get_form",
                 params={"aru": aru},
-                cookies=self.__cookie_jar,
-                headers=_HEADERS,
                 timeout=_REQUEST_TIMEOUT,
             )
             if resp_chksum.text:
-                sha256_matches = re.search(
-                    r"\b[A-Fa-f0-9]{64}\b", resp_chksum.text
-                )
+                sha256_matches = _RE_SHA256.search(resp_chksum.text)
                 if sha256_matches:
-                    checksum = sha256_matches.group(0)
+                    checksum = sha256_matches.group(0).upper()
+                    self.__aru_checksums[aru] = checksum
+                    self.__aru_checksums_changed = True
 
-        return checksum.upper()
+        return checksum
 
     @staticmethod
-    def __calculate_file_checksum(target_dir, file_name) -> str:
+    def __calculate_file_checksum(file_path) -> str:
         """Calculates the SHA-256 checksum of the downloaded file.
 
         Args:
-            target_dir (str): The target directory where patches are downloaded
-            file_name (str): patch file name
+            file_path (str): Path of the downloaded file.
 
         Returns:
             str: SHA-256 checksum of the downloaded file
         """
-        hash_chunk_size = 128 * 1024
-        with open(target_dir + os.path.sep + file_name, "rb") as checked_file:
+        return OraclePatchDownloader.__hash_file(file_path).hexdigest().upper()
+
+    @staticmethod
+    def __hash_file(file_path):
+        """Reads a file through a SHA-256 hash object.
+
+        Args:
+            file_path (str): path of the file to be hashed
+
+        Returns:
+            hashlib.sha256: the hash object, which can still be updated
+        """
+        with open(file_path, "rb") as checked_file:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(
+                    checked_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL
+                )
+
+            # Python >= 3.11 loops over the file in C
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(checked_file, "sha256")
+
             file_hash = hashlib.sha256()
-            file_chunk = checked_file.read(hash_chunk_size)
-            while file_chunk:
-                file_hash.update(file_chunk)
-                file_chunk = checked_file.read(hash_chunk_size)
+            hash_buffer = bytearray(_CHUNK_SIZE)
+            hash_view = memoryview(hash_buffer)
+            read_size = checked_file.readinto(hash_buffer)
+            while read_size:
+                file_hash.update(hash_view[:read_size])
+                read_size = checked_file.readinto(hash_buffer)
 
-        if file_hash:
-            return file_hash.hexdigest().upper()
-        else:
-            return ""
+        return file_hash
 
     def __download_em_catalog(self):
         """Downloads em_catalog.zip from Oracle Support.
@@ -776,10 +1729,7 @@ class OraclePatchDownloader:
         print("***** CALLING __download_em_catalog")
 
         total_downloaded_bytes = 0
-        local_file_path = self.target_dir + os.path.sep + "em_catalog.zip"
-        local_directory_path = self.target_dir + os.path.sep + "em_catalog"
-
-        if not pathlib.Path(local_file_path).is_file():
+        if not self.__catalog_file_path.is_file():
             total_downloaded_bytes += self.__download_link(
                 "https://updates.oracle.com/download/em_catalog.zip",
                 None,
@@ -788,15 +1738,58 @@ class OraclePatchDownloader:
                 dry_run_mode=False,
             )
 
-        pathlib.Path(self.target_dir + os.path.sep + "em_catalog").mkdir(
-            parents=True, exist_ok=True
-        )
+        self.__catalog_dir_path.mkdir(parents=True, exist_ok=True)
         logging.debug("Extract em_catalog.zip - Beginning")
-        with zipfile.ZipFile(local_file_path, "r") as cat_zip_file:
-            cat_zip_file.extractall(local_directory_path)
+        with zipfile.ZipFile(self.__catalog_file_path, "r") as cat_zip_file:
+            # Directories are created up front, so the workers below only
+            # write files and never race on makedirs.
+            file_members = []
+            member_dir_names = set()
+            for member in cat_zip_file.infolist():
+                if member.is_dir():
+                    member_dir_names.add(member.filename)
+                else:
+                    file_members.append(member)
+                    member_dir_name = member.filename.rpartition("/")[0]
+                    if member_dir_name:
+                        member_dir_names.add(member_dir_name + "/")
+            for member_dir_name in sorted(member_dir_names):
+                cat_zip_file.extract(
+                    zipfile.ZipInfo(member_dir_name), self.__catalog_dir_path
+                )
+
+        workers = max(min(os.cpu_count() or 1, len(file_members)), 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self.__extract_zip_members,
+                    self.__catalog_file_path,
+                    file_members[worker::workers],
+                    self.__catalog_dir_path,
+                )
+                for worker in range(workers)
+            ]
+            for future in futures:
+                future.result()
         logging.debug("Extract em_catalog.zip - Ended")
         return total_downloaded_bytes
 
+    @staticmethod
+    def __extract_zip_members(zip_file_path, members, target_dir_path):
+        """Extracts files from a zip file.
+
+        The zip file is opened by each caller, as a ZipFile can not be
+        shared by threads.
+
+        Args:
+            zip_file_path (pathlib.Path): path of the zip file
+            members (list): the zipfile.ZipInfo of the files to be extracted
+            target_dir_path (pathlib.Path): where the files are extracted to
+        """
+        with zipfile.ZipFile(zip_file_path, "r") as zip_file:
+            for member in members:
+                zip_file.extract(member, target_dir_path)
+
     def __build_dict_database_release_components(self):
         """Builds a dict of all database release components from the
         em_catalog/components.xml file.
@@ -811,226 +1804,330 @@ class OraclePatchDownloader:
             }
 
         """
-        components_file_path = (
-            self.target_dir
-            + os.path.sep
-            + "em_catalog"
-            + os.path.sep
-            + "components.xml"
-        )
-        components_doc = xml.etree.ElementTree.parse(components_file_path)
-
-        components_root = components_doc.getroot()
-
         self.__db_release_components = {}
-        for component in components_root.iterfind(
-            "./components/ctype[@name='RELEASE']/component"
+        ctype_name = None
+        component_depth = 0
+        for evt, elem in xml.etree.ElementTree.iterparse(
+            self.__components_file_path, events=("start", "end")
         ):
-            component_name = component.find("name").text
-            if component_name in [
-                "Oracle Database",
-                "RAC One Node",
-                "Oracle Clusterware",
-            ]:
-                lifecycle_tag = component.find("lifecycle")
-                eol_extended = None
-                eol_premium = None
-                if lifecycle_tag:
-                    eol_extended_tag = lifecycle_tag.find(
-                        "./date[@type='eol_extended']"
-                    )
-                    if eol_extended_tag is not None:
-                        eol_extended = datetime.datetime.strptime(
-                            eol_extended_tag.text, r"%Y-%m-%d"
-                        )
+            if elem.tag == "ctype":
+                if evt == "start":
+                    ctype_name = elem.get("name")
+                else:
+                    ctype_name = None
+                    elem.clear()
+            elif elem.tag == "component":
+                if evt == "start":
+                    component_depth += 1
+                    continue
+
+                component_depth -= 1
+                if component_depth == 0:
+                    if ctype_name == "RELEASE":
+                        self.__add_db_release_component(elem)
+                    elem.clear()
+
+    def __add_db_release_component(self, component):
+        """Adds a component of the RELEASE type to the dict of database
+        release components, if it is a database release.
 
-                    eol_premium_tag = lifecycle_tag.find(
-                        "./date[@type='eol_premium']"
-                    )
-                    if eol_premium_tag is not None:
-                        eol_premium = datetime.datetime.strptime(
-                            eol_premium_tag.text, r"%Y-%m-%d"
-                        )
+        Args:
+            component (Element): a "component" element from components.xml
+        """
+        component_name = component.find("name").text
+        if component_name in _DB_RELEASE_COMPONENT_NAMES:
+            lifecycle_tag = component.find("lifecycle")
+            eol_extended = None
+            eol_premium = None
+            if lifecycle_tag is not None:
+                eol_extended_tag = lifecycle_tag.find(
+                    "./date[@type='eol_extended']"
+                )
+                if eol_extended_tag is not None:
+                    eol_extended = self.__parse_date(eol_extended_tag.text)
 
-                self.__db_release_components[component.get("cid")] = {
-                    "version": component.find("version").text,
-                    "name": component_name,
-                    "eol_extended": eol_extended,
-                    "eol_premium": eol_premium,
-                }
+                eol_premium_tag = lifecycle_tag.find(
+                    "./date[@type='eol_premium']"
+                )
+                if eol_premium_tag is not None:
+                    eol_premium = self.__parse_date(eol_premium_tag.text)
+
+            self.__db_release_components[component.get("cid")] = {
+                "version": component.find("version").text,
+                "name": component_name,
+                "eol_extended": eol_extended,
+                "eol_premium": eol_premium,
+            }
 
-    def __process_patch_recommendations_file(self):
-        """Processes the patch_recommendations.xml file."""
-        recommendations_file_path = (
-            self.target_dir
-            + os.path.sep
-            + "em_catalog"
-            + os.path.sep
-            + "patch_recommendations.xml"
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def __parse_date(date_str) -> datetime.datetime:
+        """Parses a lifecycle date. The same few dates are shared by most
+        components, so the parsed dates are cached.
+
+        The catalog always uses the YYYY-MM-DD format, so the fields are
+        sliced directly instead of going through strptime.
+
+        Args:
+            date_str (str): a date in the YYYY-MM-DD format
+
+        Returns:
+            datetime.datetime: the parsed date
+        """
+        return datetime.datetime(
+            int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10])
         )
-        path_counter = collections.Counter()
 
-        self.__all_db_patches = {}
+    def __process_patch_recommendations_file(self):
+        """Processes the patch_recommendations.xml file.
 
-        # format - {(cid, platform): {patch_1, patch_2, ..., patch_n},}
-        self.__recommended_db_patches = {}
-        for evt, elem in xml.etree.ElementTree.iterparse(
-            recommendations_file_path, events=("start", "end")
+        Big files have their "patches" section split at patch boundaries and
+        parsed by worker processes, while the rest of the file is parsed
+        here.
+        """
+        recommendations_file_path = self.__recommendations_file_path
+
+        # Patches are stored by column, each patch being a row index.
+        # format - {uid: index,}
+        self.__db_patch_indexes = {}
+        # format - {field: [patch_1_value, ..., patch_n_value],}
+        self.__db_patches = {
+            "uid": [],
+            "number": [],
+            "platform_code": [],
+            "release_name": [],
+            "description": [],
+            "access_level": [],
+            "files": [],
+        }
+        # The files of all patches, each patch holding a range of rows.
+        # format - {field: [file_1_value, ..., file_n_value],}
+        self.__db_patch_files = {
+            "download_url": [],
+            "sha256sum": [],
+            "name": [],
+            "size": [],
+        }
+
+        # Recommended patches are bitsets, each uid having its own bit.
+        # format - {(cid, platform): bitset,}
+        self.__recommended_db_patches = collections.defaultdict(int)
+        # format - {uid: bit,}
+        self.__recommended_uid_bits = {}
+        # format - [uid_of_bit_0, ..., uid_of_bit_n]
+        self.__recommended_uids = []
+
+        patch_ranges = None
+        if (
+            recommendations_file_path.stat().st_size
+            >= _PARALLEL_PARSE_MIN_SIZE
+            and (os.cpu_count() or 1) > 1
         ):
-            self.__process_patches_tag(path_counter, evt, elem)
+            patch_ranges = self.__split_patches_section(
+                recommendations_file_path, os.cpu_count()
+            )
 
-            self.__process_standalone_recommendations_tag(
-                path_counter, self.__recommended_db_patches, evt, elem
+        if not patch_ranges:
+            with open(
+                recommendations_file_path, "rb"
+            ) as recommendations_file, mmap.mmap(
+                recommendations_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as recommendations_xml:
+                _parse_patch_recommendations(
+                    (recommendations_xml,),
+                    self.__add_db_patch,
+                    self.__add_recommended_db_patches,
+                )
+            return
+
+        with ProcessPoolExecutor() as executor:
+            patches_by_range = executor.map(
+                _parse_patch_recommendations_range,
+                [recommendations_file_path] * len(patch_ranges),
+                [start for start, _ in patch_ranges],
+                [end for _, end in patch_ranges],
+                [frozenset(self.__all_platforms)] * len(patch_ranges),
             )
 
-            self.__process_components_recommendations_tag(
-                path_counter, self.__recommended_db_patches, evt, elem
+            # The rest of the file holds the recommendations
+            with open(
+                recommendations_file_path, "rb"
+            ) as recommendations_file, mmap.mmap(
+                recommendations_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as recommendations_xml:
+                head_xml = recommendations_xml[: patch_ranges[0][0]]
+                tail_xml = recommendations_xml[patch_ranges[-1][1] :]
+            _parse_patch_recommendations(
+                (head_xml, tail_xml),
+                self.__add_db_patch,
+                self.__add_recommended_db_patches,
             )
 
-    def __process_patches_tag(self, path_counter, evt, elem):
-        """Processes the "patches" tags for the patch_recommendations.xml file.
+            for patches in patches_by_range:
+                for patch in patches:
+                    self.__add_db_patch(patch)
+
+    @staticmethod
+    def __split_patches_section(file_path, parts):
+        """Splits the "patches" section of a patch_recommendations.xml file
+        into ranges of whole patches.
 
         Args:
-            elem (ElementTag): an ElementTag with tag == patch.
-            path_counter (Counter): a counter collection to keep track of the
-            parent section.
+            file_path (pathlib.Path): path of the
+                patch_recommendations.xml file
+            parts (int): number of ranges wanted
+
+        Returns:
+            list: (start, end) offsets of each range, or None if the section
+            was not found.
         """
-        if evt == "start" and elem.tag == "patches":
-            path_counter["patches"] += 1
+        with open(file_path, "rb") as recommendations_file, mmap.mmap(
+            recommendations_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as recommendations_xml:
+            patches_tag_match = _RE_PATCHES_START_TAG.search(
+                recommendations_xml
+            )
+            if not patches_tag_match:
+                return None
+            start = patches_tag_match.end()
+            end = recommendations_xml.find(b"</patches>", start)
+            if end < 0:
+                return None
+
+            boundaries = [start]
+            for part in range(1, parts):
+                boundary = recommendations_xml.find(
+                    b"</patch>", start + (end - start) * part // parts, end
+                )
+                if boundary < 0:
+                    break
+                boundary += len(b"</patch>")
+                if boundary > boundaries[-1]:
+                    boundaries.append(boundary)
+            if end > boundaries[-1]:
+                boundaries.append(end)
 
-        if evt == "start" and elem.tag == "fixed_bugs":
-            elem.clear()
+        return list(zip(boundaries[:-1], boundaries[1:]))
 
-        if (
-            evt == "end"
-            and path_counter["patches"] > 0
-            and elem.tag == "patch"
-        ):
-            access_level_tag = elem.find("access")
-            if access_level_tag is not None:
-                access_level = access_level_tag.text
-            platform_id = elem.find("platform").get("id")
-            if platform_id in self.__all_platforms:
-                patch_files = []
-                for file in elem.iterfind("./files/file"):
-                    download_url_tag = file.find("download_url")
-                    patch_files.append(
-                        OraclePatchFile(
-                            download_url_tag.get("host")
-                            + download_url_tag.text,
-                            sha256sum=file.find(
-                                "./digest[@type='SHA-256']"
-                            ).text,
-                            name=file.find("name").text,
-                            size=file.find("size").text,
-                        )
-                    )
+    def __add_db_patch(self, patch):
+        """Adds a patch from the "patches" section of the
+        patch_recommendations.xml file to the database patches, if it is for
+        one of the downloader platforms.
 
-                self.__all_db_patches[elem.get("uid")] = OraclePatch(
-                    uid=elem.get("uid"),
-                    number=elem.find("name").text,
-                    description=elem.find("bug").find("abstract").text,
-                    platform_code=platform_id,
-                    release_name=elem.find("release").get("name"),
-                    access_level=access_level,
-                    files=patch_files,
-                )
+        The platform, release and access level are shared by many patches,
+        so they are interned.
 
-            elem.clear()
+        Args:
+            patch (dict): the fields parsed from a "patch" element.
+        """
+        platform_id = patch.get("platform_code")
+        if platform_id in self.__all_platforms:
+            platform_id = sys.intern(platform_id)
+            files = self.__db_patch_files
+            file_download_urls = files["download_url"]
+            file_sha256sums = files["sha256sum"]
+            file_names = files["name"]
+            file_sizes = files["size"]
+            first_file_index = len(file_names)
+            for patch_file in patch["files"]:
+                file_download_urls.append(patch_file["download_url"])
+                file_sha256sums.append(patch_file["sha256sum"])
+                file_names.append(patch_file["name"])
+                file_sizes.append(patch_file["size"])
+
+            access_level = patch["access"]
+            if access_level is not None:
+                access_level = sys.intern(access_level)
+            release_name = patch.get("release_name")
+            if release_name is not None:
+                release_name = sys.intern(release_name)
+
+            patches = self.__db_patches
+            self.__db_patch_indexes[patch["uid"]] = len(patches["uid"])
+            patches["uid"].append(patch["uid"])
+            patches["number"].append(patch["name"])
+            patches["platform_code"].append(platform_id)
+            patches["release_name"].append(release_name)
+            patches["description"].append(patch["description"])
+            patches["access_level"].append(access_level)
+            patches["files"].append(range(first_file_index, len(file_names)))
+
+    def __get_db_patch(self, patch_index):
+        """Returns a database patch.
 
-        if evt == "end" and elem.tag == "patches":
-            path_counter["patches"] -= 1
-            elem.clear()
+        Args:
+            patch_index (int): row of the patch in the patches columns.
 
-    def __process_standalone_recommendations_tag(
-        self, path_counter, recommended_patches, evt, elem
-    ):
-        """Processes the "standalone_recommendations" tags for the
-        patch_recommendations.xml file.
+        Returns:
+            OraclePatch: the patch
+        """
+        patches = self.__db_patches
+        return OraclePatch(
+            patches["uid"][patch_index],
+            number=patches["number"][patch_index],
+            platform_code=patches["platform_code"][patch_index],
+            release_name=patches["release_name"][patch_index],
+            description=patches["description"][patch_index],
+            access_level=patches["access_level"][patch_index],
+            files=[
+                self.__get_db_patch_file(file_index)
+                for file_index in patches["files"][patch_index]
+            ],
+        )
+
+    def __get_db_patch_file(self, file_index):
+        """Returns a file of a database patch.
 
         Args:
-            path_counter (Counter): a counter collection to keep track of the
-            parent section.
-            recommended_patches (set): an existing set of recommended patches
-            that will receive the recommendations for the standalone section.
-            evt (str): which event is being processed at the moment.
-            elem (ElementTag): an ElementTag with tag == patch.
+            file_index (int): row of the file in the patch files columns.
+
+        Returns:
+            OraclePatchFile: the patch file
         """
-        if evt == "start" and elem.tag == "standalone_recommendations":
-            path_counter["standalone_recommendations"] += 1
+        files = self.__db_patch_files
+        return OraclePatchFile(
+            files["download_url"][file_index],
+            sha256sum=files["sha256sum"][file_index],
+            name=files["name"][file_index],
+            size=files["size"][file_index],
+        )
 
-        if (
-            evt == "end"
-            and path_counter["standalone_recommendations"] > 0
-            and elem.tag == "release"
-        ):
-            if elem.get("cid") in self.__db_release_components:
-                component_id = elem.get("cid")
-                for platform in elem:
-                    platform_id = platform.get("id")
-                    if platform_id in self.__all_platforms:
-                        if (
-                            component_id,
-                            platform_id,
-                        ) not in recommended_patches:
-                            recommended_patches[
-                                (component_id, platform_id)
-                            ] = set()
-                        for patch in platform:
-                            recommended_patches[
-                                (component_id, platform_id)
-                            ].add(patch.get("uid"))
-            elem.clear()
-
-        if evt == "end" and elem.tag == "standalone_recommendations":
-            path_counter["standalone_recommendations"] -= 1
-            elem.clear()
-
-    def __process_components_recommendations_tag(
-        self, path_counter, recommended_patches, evt, elem
-    ):
-        """Processes the "components_recommendations" tags for the
-        patch_recommendations.xml file.
+    def __add_recommended_db_patches(self, component_id, platform_id, uids):
+        """Adds the patches recommended for a release and platform by the
+        "standalone_recommendations" or "components_recommendations" section
+        of the patch_recommendations.xml file.
+
+        Each uid is given a bit of the recommendation bitsets. The same
+        components, platforms and patches are recommended many times, so
+        their ids are interned.
 
         Args:
-            path_counter (Counter): a counter collection to keep track of the
-            parent section.
-            recommended_patches (set): an existing set of recommended patches
-            that will receive the recommendations for the standalone section.
-            evt (str): which event is being processed at the moment.
-            elem (ElementTag): an ElementTag with tag == patch.
+            component_id (str): the cid of the recommended release.
+            platform_id (str): the platform the patches are recommended for.
+            uids (list): the uids of the recommended patches.
         """
-        if evt == "start" and elem.tag == "components_recommendations":
-            path_counter["components_recommendations"] += 1
-
         if (
-            evt == "end"
-            and path_counter["components_recommendations"] > 0
-            and elem.tag == "release"
+            component_id in self.__db_release_components
+            and platform_id in self.__all_platforms
         ):
-            if elem.get("cid") in self.__db_release_components:
-                component_id = elem.get("cid")
-                for platform in elem:
-                    platform_id = platform.get("id")
-                    if platform_id in self.__all_platforms:
-                        if (
-                            component_id,
-                            platform_id,
-                        ) not in recommended_patches:
-                            recommended_patches[
-                                (component_id, platform_id)
-                            ] = set()
-                        for patch in platform:
-                            recommended_patches[
-                                (component_id, platform_id)
-                            ].add(patch.get("uid"))
-            elem.clear()
-
-        if evt == "end" and elem.tag == "components_recommendations":
-            path_counter["components_recommendations"] -= 1
-            elem.clear()
+            recommendation_key = (
+                sys.intern(component_id),
+                sys.intern(platform_id),
+            )
+            uid_bits = self.__recommended_uid_bits
+            recommended_uids = self.__recommended_uids
+            patch_bits = 0
+            for uid in uids:
+                uid_bit = uid_bits.get(uid)
+                if uid_bit is None:
+                    uid_bit = len(recommended_uids)
+                    uid_bits[uid] = uid_bit
+                    recommended_uids.append(sys.intern(uid))
+                patch_bits |= 1 << uid_bit
+            self.__recommended_db_patches[recommendation_key] |= patch_bits
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def __normalize_directory_name(orig_name) -> str:
         """Replaces undesirable characters from a planned directory name
         with underscore characters.
@@ -1041,36 +2138,24 @@ class OraclePatchDownloader:
         Returns:
             str: the normalized name.
         """
-        normalized_name = re.sub("[^a-zA-Z0-9_.-]+", "_", orig_name)
-        normalized_name = re.sub("_$", "", normalized_name)
-        normalized_name = re.sub("^_", "", normalized_name)
-
-        return normalized_name
+        return _RE_DIR_NAME_EDGE_UNDERSCORE.sub(
+            "", _RE_DIR_NAME_INVALID_CHARS.sub("_", orig_name)
+        )
 
 
-class OraclePatch:
+class OraclePatch(NamedTuple):
     """Structure grouping attributes of an Oracle Patch."""
 
-    def __init__(
-        self,
-        uid,
-        number,
-        platform_code,
-        release_name,
-        description,
-        access_level,
-        files,
-    ):
-        self.uid = uid
-        self.number = number
-        self.platform_code = platform_code
-        self.release_name = release_name
-        self.description = description
-        self.access_level = access_level
-        self.files = files
+    uid: str
+    number: str
+    platform_code: str
+    release_name: str
+    description: str
+    access_level: str
+    files: list
 
     def __str__(self):
-        return str(self.__dict__)
+        return str(dict(self._asdict()))
 
     def __repr__(self):
         repr_str = (
@@ -1080,24 +2165,40 @@ class OraclePatch:
         )
         return repr_str
 
+    # Patches are compared by uid only, so every comparison of the tuple
+    # is overridden.
     def __eq__(self, other):
         return self.uid == other.uid
 
+    def __ne__(self, other):
+        return self.uid != other.uid
+
     def __lt__(self, other):
         return self.uid < other.uid
 
+    def __le__(self, other):
+        return self.uid <= other.uid
 
-class OraclePatchFile:
+    def __gt__(self, other):
+        return self.uid > other.uid
+
+    def __ge__(self, other):
+        return self.uid >= other.uid
+
+    def __hash__(self):
+        return hash(self.uid)
+
+
+class OraclePatchFile(NamedTuple):
     """Structure grouping attributes of an Oracle Patch file."""
 
-    def __init__(self, download_url, sha256sum, name, size):
-        self.download_url = download_url
-        self.sha256sum = sha256sum
-        self.name = name
-        self.size = size
+    download_url: str
+    sha256sum: str
+    name: str
+    size: int
 
     def __str__(self):
-        return str(self.__dict__)
+        return str(dict(self._asdict()))
 
     def __repr__(self):
         repr_str = (
@@ -1122,5 +2223,9 @@ class ChecksumMismatch(Exception):
     """Raised when the downloaded file checksum does not match Oracle's."""
 
 
+class SegmentedDownloadError(Exception):
+    """Raised when a file cannot be downloaded in byte ranges."""
+
+
 class OracleSupportError(Exception):
     """Raised when not able to log on to Oracle Support."""